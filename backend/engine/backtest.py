@@ -74,6 +74,43 @@ def calculate_clmm_il(p0: float, p1: float, pa: float, pb: float) -> float:
     return (v_lp - v_hodl) / v_hodl
 
 
+def calculate_clmm_il_batch(
+    p0: np.ndarray | float,
+    p1: np.ndarray | float,
+    pa: np.ndarray | float,
+    pb: np.ndarray | float,
+) -> np.ndarray:
+    """
+    Vectorized calculate_clmm_il. Inputs broadcast against each other,
+    so one call evaluates many paths x many positions.
+    Returns IL as a fraction (negative = loss vs HODL).
+    """
+    p0, p1, pa, pb = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (p0, p1, pa, pb))
+    )
+    valid = (pa < pb) & (pa >= 0) & (p0 > 0) & (p1 > 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqrt_pa = np.sqrt(pa)
+        sqrt_pb = np.sqrt(pb)
+
+        # Clamping to the range reproduces the all-X / all-Y boundary cases
+        eff_p0 = np.clip(p0, pa, pb)
+        eff_p1 = np.clip(p1, pa, pb)
+
+        x1 = 1.0 / np.sqrt(eff_p1) - 1.0 / sqrt_pb
+        y1 = np.sqrt(eff_p1) - sqrt_pa
+        v_lp = x1 * p1 + y1
+
+        x0 = 1.0 / np.sqrt(eff_p0) - 1.0 / sqrt_pb
+        y0 = np.sqrt(eff_p0) - sqrt_pa
+        v_hodl = x0 * p1 + y0
+
+        il = (v_lp - v_hodl) / v_hodl
+
+    return np.where(valid & (v_hodl != 0), il, 0.0)
+
+
 def estimate_fee_income(
     prices: np.ndarray,
     pa: float,
@@ -1,10 +1,122 @@
 """
 Monte Carlo simulation for CLMM LP risk analysis.
-Uses Geometric Brownian Motion (GBM) price paths.
+Price paths come from Geometric Brownian Motion (GBM) or a block bootstrap
+of historical hourly log returns.
 """
 
 import numpy as np
-from .backtest import calculate_clmm_il, estimate_fee_income
+import pandas as pd
+from .backtest import calculate_clmm_il, calculate_clmm_il_batch, estimate_fee_income
+
+HOURS_PER_YEAR = 365 * 24
+
+PATH_MODELS = ("gbm", "bootstrap")
+# History the bootstrap needs (and that makes it the default model); shorter
+# series only have a handful of distinct blocks to resample
+MIN_BOOTSTRAP_HOURS = 14 * 24
+
+# Overlapping hourly returns required to estimate cross-pool correlation
+MIN_CORRELATION_HOURS = 7 * 24
+
+# Share of simulations on each side of the 5th percentile averaged for
+# per-position VaR contributions
+VAR_KERNEL_FRACTION = 0.01
+
+# Max elements of a (sims, hours, positions) block held in memory at once
+PORTFOLIO_BATCH_ELEMENTS = 1 << 18
+
+
+def generate_gbm_paths(
+    current_price: float,
+    volatility: float,
+    drift: float,
+    hold_days: int,
+    n_simulations: int,
+    seed: int = 42,
+) -> np.ndarray:
+    """
+    Hourly GBM price paths starting at current_price.
+    Returns array of shape (n_simulations, hold_days * 24 + 1).
+    """
+    n_hours = hold_days * 24
+    dt = 1.0 / HOURS_PER_YEAR  # hourly step
+
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((n_simulations, n_hours))
+    log_returns = (drift - 0.5 * volatility**2) * dt + volatility * np.sqrt(dt) * z
+
+    return _paths_from_log_returns(current_price, log_returns)
+
+
+def generate_bootstrap_paths(
+    current_price: float,
+    price_history: np.ndarray,
+    hold_days: int,
+    n_simulations: int,
+    block_hours: int = 24,
+    seed: int = 42,
+) -> np.ndarray:
+    """
+    Hourly price paths from a moving-block bootstrap of historical log
+    returns, keeping their fat tails and volatility clustering.
+    Blocks are gathered by index from one contiguous return array.
+    Returns array of shape (n_simulations, hold_days * 24 + 1).
+    """
+    if len(price_history) <= MIN_BOOTSTRAP_HOURS:
+        raise ValueError(
+            f"bootstrap needs more than {MIN_BOOTSTRAP_HOURS} hourly prices, "
+            f"got {len(price_history)}"
+        )
+    returns = np.ascontiguousarray(np.diff(np.log(np.asarray(price_history, dtype=float))))
+    n_returns = len(returns)
+
+    n_hours = hold_days * 24
+    block = max(1, min(block_hours, n_returns))
+    n_blocks = -(-n_hours // block)
+
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, n_returns - block + 1, size=(n_simulations, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_simulations, -1)[:, :n_hours]
+
+    return _paths_from_log_returns(current_price, returns[idx])
+
+
+def _paths_from_log_returns(current_price: float, log_returns: np.ndarray) -> np.ndarray:
+    n_simulations, n_hours = log_returns.shape
+    paths = np.empty((n_simulations, n_hours + 1))
+    paths[:, 0] = current_price
+    paths[:, 1:] = current_price * np.exp(np.cumsum(log_returns, axis=1))
+    return paths
+
+
+def default_path_model(price_history: np.ndarray | None) -> str:
+    """Bootstrap when there is enough history to resample, else GBM."""
+    if price_history is not None and len(price_history) > MIN_BOOTSTRAP_HOURS:
+        return "bootstrap"
+    return "gbm"
+
+
+def generate_paths(
+    model: str,
+    current_price: float,
+    volatility: float,
+    drift: float,
+    hold_days: int,
+    n_simulations: int,
+    price_history: np.ndarray | None = None,
+) -> np.ndarray:
+    """Dispatch to the requested path generator."""
+    if model == "gbm":
+        return generate_gbm_paths(
+            current_price, volatility, drift, hold_days, n_simulations
+        )
+    if model == "bootstrap":
+        if price_history is None:
+            raise ValueError("bootstrap model requires price_history")
+        return generate_bootstrap_paths(
+            current_price, price_history, hold_days, n_simulations
+        )
+    raise ValueError(f"unknown path model '{model}', expected one of {PATH_MODELS}")
 
 
 def run_monte_carlo(
@@ -18,27 +130,25 @@ def run_monte_carlo(
     hold_days: int,
     range_pct: float,
     n_simulations: int = 2000,
+    model: str = "gbm",
+    price_history: np.ndarray | None = None,
 ) -> dict:
     """
     Monte Carlo simulation of LP PnL.
+    model: "gbm" (volatility/drift) or "bootstrap" (resamples price_history).
     Returns distribution stats + histogram data.
     """
     pa = current_price * (1 - range_pct)
     pb = current_price * (1 + range_pct)
-    n_hours = hold_days * 24
-    dt = 1.0 / (365 * 24)  # hourly step
 
-    rng = np.random.default_rng(42)
+    paths = generate_paths(
+        model, current_price, volatility, drift, hold_days, n_simulations,
+        price_history,
+    )
 
     pnl_results = []
 
-    for _ in range(n_simulations):
-        # Generate GBM price path
-        z = rng.standard_normal(n_hours)
-        log_returns = (drift - 0.5 * volatility**2) * dt + volatility * np.sqrt(dt) * z
-        prices = current_price * np.exp(np.cumsum(log_returns))
-        prices = np.insert(prices, 0, current_price)
-
+    for prices in paths:
         # IL
         p1 = prices[-1]
         il_frac = calculate_clmm_il(current_price, p1, pa, pb)
@@ -54,7 +164,16 @@ def run_monte_carlo(
 
     pnl = np.array(pnl_results)
 
-    # Stats
+    return {
+        **_summarize_pnl(pnl),
+        "n_simulations": n_simulations,
+        "model": model,
+        "range": [round(pa, 4), round(pb, 4)],
+    }
+
+
+def _summarize_pnl(pnl: np.ndarray) -> dict:
+    """Distribution stats + histogram data for a PnL sample."""
     mean_pnl = float(np.mean(pnl))
     median_pnl = float(np.median(pnl))
     std_pnl = float(np.std(pnl))
@@ -80,7 +199,182 @@ def run_monte_carlo(
         "var_95": round(var_95, 2),
         "var_99": round(var_99, 2),
         "profit_probability": round(profit_prob, 4),
-        "n_simulations": n_simulations,
         "histogram": histogram,
-        "range": [round(pa, 4), round(pb, 4)],
+    }
+
+
+def _hourly_log_returns(prices: pd.Series) -> pd.Series:
+    """
+    Log returns between consecutive clock hours, indexed by hour. Prices are
+    floored to the hour (last sample wins); returns across gaps are dropped.
+    """
+    hourly = prices.groupby(prices.index.floor("h")).last()
+    hours = hourly.index.to_series()
+    returns = np.log(hourly).diff()
+    return returns[hours.diff() == pd.Timedelta(hours=1)]
+
+
+def estimate_return_correlation(
+    price_histories: list[pd.Series],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Annualized volatility, drift and return correlation matrix across pools.
+    price_histories: close prices indexed by timestamp.
+    Vol and drift use each pool's full history; the correlation uses only
+    the clock hours all histories have a return for.
+    Returns (volatility, drift, correlation, n_obs) where n_obs is the
+    number of aligned hourly returns behind the correlation.
+    """
+    pool_returns = [np.diff(np.log(p.to_numpy(dtype=float))) for p in price_histories]
+    volatility = np.array([r.std() for r in pool_returns]) * np.sqrt(HOURS_PER_YEAR)
+    drift = np.array([r.mean() for r in pool_returns]) * HOURS_PER_YEAR
+
+    overlap = pd.concat(
+        [_hourly_log_returns(p) for p in price_histories], axis=1, join="inner"
+    ).dropna()
+    n_obs = len(overlap)
+    if n_obs < MIN_CORRELATION_HOURS:
+        raise ValueError(
+            f"price histories share only {n_obs} aligned hourly returns, "
+            f"need at least {MIN_CORRELATION_HOURS} to estimate correlation"
+        )
+
+    # Flat series (e.g. stable pairs) have undefined correlation: treat as independent
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.atleast_2d(np.corrcoef(overlap.to_numpy(), rowvar=False))
+    corr = np.nan_to_num(corr, nan=0.0)
+    np.fill_diagonal(corr, 1.0)
+
+    return volatility, drift, corr, n_obs
+
+
+def _cholesky_psd(corr: np.ndarray) -> np.ndarray:
+    """
+    Cholesky factor of a correlation matrix, adding diagonal jitter when
+    it is only positive semi-definite (e.g. two pools priced off one token).
+    """
+    n = corr.shape[0]
+    jitter = 0.0
+    for _ in range(10):
+        try:
+            return np.linalg.cholesky(corr + jitter * np.eye(n))
+        except np.linalg.LinAlgError:
+            jitter = max(jitter * 10, 1e-10)
+    # Fall back to the eigen-clipped matrix
+    w, v = np.linalg.eigh(corr)
+    return v * np.sqrt(np.clip(w, 0.0, None))
+
+
+def run_portfolio_monte_carlo(
+    positions: list[dict],
+    price_histories: dict[str, pd.Series],
+    hold_days: int,
+    n_simulations: int = 2000,
+) -> dict:
+    """
+    Correlated Monte Carlo of a book of LP positions across pools.
+
+    positions: dicts with pool_id, current_price, fee_rate, amount_usd,
+        pool_tvl, daily_volume, range_pct. Several positions may share a pool.
+    price_histories: hourly prices indexed by timestamp per pool_id, used
+        to estimate vol, drift and the cross-pool correlation matrix.
+
+    All pools are driven by one correlated GBM draw (Cholesky factor of the
+    return correlation); fees and IL are evaluated for every position and
+    path at once. Returns portfolio distribution stats + per-position Euler
+    VaR contributions (mean position PnL in scenarios near the portfolio
+    5th percentile).
+    """
+    pool_ids = list(dict.fromkeys(p["pool_id"] for p in positions))
+    pool_idx = np.array([pool_ids.index(p["pool_id"]) for p in positions])
+    volatility, drift, corr, n_obs = estimate_return_correlation(
+        [price_histories[pid] for pid in pool_ids]
+    )
+    chol = _cholesky_psd(corr)
+
+    n_pools = len(pool_ids)
+    n_positions = len(positions)
+    n_hours = hold_days * 24
+    dt = 1.0 / HOURS_PER_YEAR
+
+    range_pct = np.array([p["range_pct"] for p in positions], dtype=float)
+    amount = np.array([p["amount_usd"] for p in positions], dtype=float)
+    fee_rate = np.array([p["fee_rate"] for p in positions], dtype=float)
+    tvl = np.array([p["pool_tvl"] for p in positions], dtype=float)
+    daily_volume = np.array(
+        [p.get("daily_volume") or 0.0 for p in positions], dtype=float
+    )
+    lp_share = amount / np.maximum(tvl, amount)
+
+    # Paths are simulated relative to spot (p0 = 1): range, fee and IL math
+    # are all scale-free, so pools with very different prices share one draw.
+    with np.errstate(divide="ignore"):
+        log_lower = np.log1p(-range_pct)
+    log_upper = np.log1p(range_pct)
+    mu = (drift - 0.5 * volatility**2) * dt
+    sigma = volatility * np.sqrt(dt)
+
+    rng = np.random.default_rng(42)
+    batch = max(1, PORTFOLIO_BATCH_ELEMENTS // (n_hours * max(n_pools, n_positions)))
+
+    fee_usd = np.empty((n_simulations, n_positions))
+    il_frac = np.empty((n_simulations, n_positions))
+    for start in range(0, n_simulations, batch):
+        stop = min(start + batch, n_simulations)
+        z = rng.standard_normal((stop - start, n_hours, n_pools)) @ chol.T
+        log_returns = mu + sigma * z
+        log_paths = np.cumsum(log_returns, axis=1)
+
+        # Hours in range per position (+1 for the entry hour, always in range)
+        pos_paths = log_paths[:, :, pool_idx]
+        hours_in_range = 1 + np.count_nonzero(
+            (pos_paths >= log_lower) & (pos_paths <= log_upper), axis=1
+        )
+
+        # Same volume model as estimate_fee_income, per path where no volume
+        est_daily_volume = tvl * log_returns.std(axis=1)[:, pool_idx] * np.sqrt(24) * 2.0
+        hourly_volume = np.where(daily_volume > 0, daily_volume, est_daily_volume) / 24.0
+        fee_usd[start:stop] = hourly_volume * fee_rate * lp_share * hours_in_range
+
+        p1 = np.exp(log_paths[:, -1, pool_idx])
+        il_frac[start:stop] = calculate_clmm_il_batch(1.0, p1, 1 - range_pct, 1 + range_pct)
+
+    position_pnl = fee_usd - np.abs(il_frac) * amount
+    pnl = position_pnl.sum(axis=1)
+
+    # Euler allocation of VaR: each position's expected PnL in the scenarios
+    # around the portfolio's 5th percentile. Contributions add up to the
+    # portfolio PnL in those scenarios, which estimates var_95.
+    position_mean = position_pnl.mean(axis=0)
+    order = np.argsort(pnl)
+    k = int(0.05 * n_simulations)
+    half = max(1, int(VAR_KERNEL_FRACTION * n_simulations))
+    tail = order[max(0, k - half): k + half + 1]
+    contribution = position_pnl[tail].mean(axis=0)
+    tail_pnl = float(contribution.sum())
+
+    return {
+        **_summarize_pnl(pnl),
+        "n_simulations": n_simulations,
+        "pools": pool_ids,
+        "correlation": np.round(corr, 4).tolist(),
+        "correlation_hours": n_obs,
+        "volatility": {pid: round(float(v), 4) for pid, v in zip(pool_ids, volatility)},
+        "positions": [
+            {
+                "pool_id": p["pool_id"],
+                "amount_usd": p["amount_usd"],
+                "range": [
+                    round(p["current_price"] * (1 - p["range_pct"]), 4),
+                    round(p["current_price"] * (1 + p["range_pct"]), 4),
+                ],
+                "mean_pnl": round(float(position_mean[j]), 2),
+                "std_pnl": round(float(position_pnl[:, j].std()), 2),
+                "var_95_contribution": round(float(contribution[j]), 2),
+                "var_95_contribution_pct": round(
+                    float(contribution[j] / tail_pnl) if tail_pnl != 0 else 0.0, 4
+                ),
+            }
+            for j, p in enumerate(positions)
+        ],
     }
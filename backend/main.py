@@ -1,14 +1,24 @@
 """FastAPI backend for Cetus LP Risk Copilot."""
 
+import asyncio
+
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import numpy as np
 
 from services.pool_fetcher import fetch_pools, get_pool_by_id
-from services.price_fetcher import get_prices
+from services.price_fetcher import get_price_series, get_prices
 from engine.backtest import simulate_strategies
-from engine.monte_carlo import run_monte_carlo
+from engine.monte_carlo import (
+    PATH_MODELS,
+    default_path_model,
+    generate_paths,
+    run_monte_carlo,
+    run_portfolio_monte_carlo,
+)
+from engine.rebalance import RebalancePolicy, run_rebalancing_backtest
 
 app = FastAPI(title="Cetus LP Risk Copilot", version="1.0.0")
 
@@ -41,6 +51,7 @@ class MonteCarloRequest(BaseModel):
     hold_days: int = 30
     range_pct: float = 0.15
     n_simulations: int = 2000
+    model: str | None = None  # gbm | bootstrap; defaults by history length
 
     def validate_inputs(self):
         if self.amount_usd <= 0 or self.amount_usd > 10_000_000:
@@ -51,6 +62,85 @@ class MonteCarloRequest(BaseModel):
             raise HTTPException(400, "range_pct must be between 0 and 1.0")
         if self.n_simulations < 100 or self.n_simulations > 10000:
             raise HTTPException(400, "n_simulations must be between 100 and 10,000")
+        if self.model is not None and self.model not in PATH_MODELS:
+            raise HTTPException(400, "model must be 'gbm' or 'bootstrap'")
+
+
+class PortfolioPosition(BaseModel):
+    pool_id: str
+    amount_usd: float = 1000
+    range_pct: float = 0.15
+
+
+class PortfolioMonteCarloRequest(BaseModel):
+    positions: list[PortfolioPosition]
+    hold_days: int = 30
+    n_simulations: int = 2000
+
+    def validate_inputs(self):
+        if not self.positions or len(self.positions) > 100:
+            raise HTTPException(400, "positions must contain between 1 and 100 entries")
+        for pos in self.positions:
+            if not pos.pool_id.strip():
+                raise HTTPException(400, "pool_id is required")
+            if pos.amount_usd <= 0 or pos.amount_usd > 10_000_000:
+                raise HTTPException(400, "amount_usd must be between 0 and 10,000,000")
+            if pos.range_pct <= 0 or pos.range_pct > 1.0:
+                raise HTTPException(400, "range_pct must be between 0 and 1.0")
+        if self.hold_days < 1 or self.hold_days > 365:
+            raise HTTPException(400, "hold_days must be between 1 and 365")
+        if self.n_simulations < 100 or self.n_simulations > 10000:
+            raise HTTPException(400, "n_simulations must be between 100 and 10,000")
+        # ~1.5s of CPU at 2,000 paths x 10 positions x 90 days
+        if self.n_simulations * len(self.positions) * self.hold_days > 1_800_000:
+            raise HTTPException(400, "n_simulations x positions x hold_days must be at most 1,800,000")
+
+
+class RebalancePolicySpec(BaseModel):
+    range_pct: float = 0.15
+    threshold: float | None = None
+    cooldown_hours: int = 0
+
+
+class RebalanceBacktestRequest(BaseModel):
+    pool_id: str
+    amount_usd: float = 1000
+    hold_days: int = 30
+    policies: list[RebalancePolicySpec]
+    gas_usd: float = 0.05
+    source: str = "historical"  # historical | monte_carlo
+    n_simulations: int = 500  # source=monte_carlo only
+    model: str | None = None  # gbm | bootstrap, source=monte_carlo only
+
+    def validate_inputs(self):
+        if self.amount_usd <= 0 or self.amount_usd > 10_000_000:
+            raise HTTPException(400, "amount_usd must be between 0 and 10,000,000")
+        if self.hold_days < 1 or self.hold_days > 365:
+            raise HTTPException(400, "hold_days must be between 1 and 365")
+        if not self.pool_id.strip():
+            raise HTTPException(400, "pool_id is required")
+        if not self.policies or len(self.policies) > 10:
+            raise HTTPException(400, "policies must contain between 1 and 10 entries")
+        for policy in self.policies:
+            if policy.range_pct <= 0 or policy.range_pct > 1.0:
+                raise HTTPException(400, "range_pct must be between 0 and 1.0")
+            if policy.threshold is not None and (policy.threshold <= 0 or policy.threshold > 1.0):
+                raise HTTPException(400, "threshold must be between 0 and 1.0")
+            if policy.cooldown_hours < 0:
+                raise HTTPException(400, "cooldown_hours must be >= 0")
+        if self.gas_usd < 0:
+            raise HTTPException(400, "gas_usd must be >= 0")
+        if self.source not in ("historical", "monte_carlo"):
+            raise HTTPException(400, "source must be 'historical' or 'monte_carlo'")
+        if self.n_simulations < 100 or self.n_simulations > 2000:
+            raise HTTPException(400, "n_simulations must be between 100 and 2,000")
+        # ~2s of CPU at 2,000 paths x 10 policies x 90 days
+        if self.source == "monte_carlo" and self.n_simulations * len(self.policies) * self.hold_days > 1_800_000:
+            raise HTTPException(400, "n_simulations x policies x hold_days must be at most 1,800,000")
+        if self.model is not None and self.model not in PATH_MODELS:
+            raise HTTPException(400, "model must be 'gbm' or 'bootstrap'")
+        if self.model is not None and self.source == "historical":
+            raise HTTPException(400, "model only applies to source 'monte_carlo'")
 
 
 @app.get("/api/pools")
@@ -107,18 +197,124 @@ async def monte_carlo(req: MonteCarloRequest):
     annualized_vol = hourly_vol * np.sqrt(24 * 365)
     drift = float(np.mean(returns)) * 24 * 365
 
-    result = run_monte_carlo(
-        current_price=live_price,
-        volatility=annualized_vol,
-        drift=drift,
+    try:
+        result = run_monte_carlo(
+            current_price=live_price,
+            volatility=annualized_vol,
+            drift=drift,
+            fee_rate=pool["fee_rate"],
+            amount_usd=req.amount_usd,
+            pool_tvl=pool["tvl"],
+            daily_volume=pool.get("daily_volume"),
+            hold_days=req.hold_days,
+            range_pct=req.range_pct,
+            n_simulations=req.n_simulations,
+            model=req.model or default_path_model(prices),
+            price_history=prices,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return result
+
+
+@app.post("/api/backtest/rebalance")
+async def rebalance_backtest(req: RebalanceBacktestRequest):
+    req.validate_inputs()
+    pools = await fetch_pools()
+    pool = get_pool_by_id(req.pool_id, pools)
+    if not pool:
+        raise HTTPException(404, f"Pool {req.pool_id} not found")
+
+    prices = await get_prices(req.pool_id, days=max(req.hold_days, 30), current_price=pool["current_price"])
+
+    if req.source == "monte_carlo":
+        live_price = float(prices[-1]) if len(prices) > 0 else pool["current_price"]
+        returns = np.diff(np.log(prices))
+        hourly_vol = float(np.std(returns))
+        annualized_vol = hourly_vol * np.sqrt(24 * 365)
+        drift = float(np.mean(returns)) * 24 * 365
+        try:
+            paths = generate_paths(
+                req.model or default_path_model(prices),
+                live_price, annualized_vol, drift, req.hold_days, req.n_simulations,
+                price_history=prices,
+            )
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+    else:
+        paths = prices[-req.hold_days * 24:]
+
+    results = await run_in_threadpool(
+        run_rebalancing_backtest,
+        prices=paths,
         fee_rate=pool["fee_rate"],
         amount_usd=req.amount_usd,
         pool_tvl=pool["tvl"],
         daily_volume=pool.get("daily_volume"),
-        hold_days=req.hold_days,
-        range_pct=req.range_pct,
-        n_simulations=req.n_simulations,
+        policies=[
+            RebalancePolicy(p.range_pct, p.threshold, p.cooldown_hours)
+            for p in req.policies
+        ],
+        gas_usd=req.gas_usd,
+    )
+    return {
+        "pool_id": req.pool_id,
+        "source": req.source,
+        "n_paths": len(np.atleast_2d(paths)),
+        "hold_days": req.hold_days,
+        "policies": results,
+    }
+
+
+@app.post("/api/monte-carlo/portfolio")
+async def portfolio_monte_carlo(req: PortfolioMonteCarloRequest):
+    req.validate_inputs()
+    pools = await fetch_pools()
+
+    pool_info = {}
+    for pos in req.positions:
+        if pos.pool_id in pool_info:
+            continue
+        pool = get_pool_by_id(pos.pool_id, pools)
+        if not pool:
+            raise HTTPException(404, f"Pool {pos.pool_id} not found")
+        pool_info[pos.pool_id] = pool
+
+    # Timestamped real data only: mock histories would correlate perfectly
+    days = max(req.hold_days, 30)
+    series = await asyncio.gather(
+        *(get_price_series(pool_id, days=days) for pool_id in pool_info)
     )
+    price_histories = dict(zip(pool_info, series))
+    for pool_id, prices in price_histories.items():
+        if prices is None:
+            raise HTTPException(400, f"No price history for pool {pool_id}")
+    live_prices = {pool_id: float(prices.iloc[-1]) for pool_id, prices in price_histories.items()}
+
+    positions = [
+        {
+            "pool_id": pos.pool_id,
+            "current_price": live_prices[pos.pool_id],
+            "fee_rate": pool_info[pos.pool_id]["fee_rate"],
+            "amount_usd": pos.amount_usd,
+            "pool_tvl": pool_info[pos.pool_id]["tvl"],
+            "daily_volume": pool_info[pos.pool_id].get("daily_volume"),
+            "range_pct": pos.range_pct,
+        }
+        for pos in req.positions
+    ]
+
+    try:
+        # CPU-bound for large books: keep it off the event loop
+        result = await run_in_threadpool(
+            run_portfolio_monte_carlo,
+            positions=positions,
+            price_histories=price_histories,
+            hold_days=req.hold_days,
+            n_simulations=req.n_simulations,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     return result
 
 
@@ -101,20 +101,28 @@ def get_cached_prices(pool_id: str, days: int = 30) -> np.ndarray | None:
     return None
 
 
+def get_cached_series(pool_id: str, days: int = 30) -> pd.Series | None:
+    """Load cached hourly close prices indexed by timestamp, trimmed to requested days."""
+    cache_file = CACHE_DIR / f"{pool_id}_prices.csv"
+    if cache_file.exists():
+        df = pd.read_csv(cache_file)
+        if len(df) > 24 and "timestamp" in df:
+            series = pd.Series(
+                df["close"].values, index=pd.to_datetime(df["timestamp"]), name=pool_id
+            )
+            return series.iloc[-days * 24:]
+    return None
+
+
 def save_cache(pool_id: str, df: pd.DataFrame):
     cache_file = CACHE_DIR / f"{pool_id}_prices.csv"
     df.to_csv(cache_file, index=False)
 
 
-async def get_prices(pool_id: str, days: int = 30, current_price: float | None = None) -> np.ndarray:
+async def fetch_live_prices(pool_id: str, days: int = 30) -> pd.DataFrame | None:
     """
-    Get hourly close prices. Try cache → Birdeye → CoinGecko → mock.
+    Fetch timestamped close prices. Try Birdeye → CoinGecko, caching hits.
     """
-    # Try cache (trimmed to requested days)
-    cached = get_cached_prices(pool_id, days=days)
-    if cached is not None:
-        return cached
-
     # Map pool_id to token
     token_map = {
         "sui-usdc": ("SUI", "sui"),
@@ -128,12 +136,43 @@ async def get_prices(pool_id: str, days: int = 30, current_price: float | None =
     df = await fetch_birdeye_ohlcv(addr, days=days)
     if df is not None and len(df) > 0:
         save_cache(pool_id, df)
-        return df["close"].values
+        return df
 
     # Try CoinGecko
     df = await fetch_coingecko_prices(coingecko_id, days=days)
     if df is not None and len(df) > 0:
         save_cache(pool_id, df)
+        return df
+
+    return None
+
+
+async def get_price_series(pool_id: str, days: int = 30) -> pd.Series | None:
+    """
+    Get timestamped hourly close prices. Try cache → Birdeye → CoinGecko.
+    Returns None rather than mock data when no source has the pool.
+    """
+    cached = get_cached_series(pool_id, days=days)
+    if cached is not None:
+        return cached
+
+    df = await fetch_live_prices(pool_id, days=days)
+    if df is not None:
+        return pd.Series(df["close"].values, index=pd.to_datetime(df["timestamp"]), name=pool_id)
+    return None
+
+
+async def get_prices(pool_id: str, days: int = 30, current_price: float | None = None) -> np.ndarray:
+    """
+    Get hourly close prices. Try cache → Birdeye → CoinGecko → mock.
+    """
+    # Try cache (trimmed to requested days)
+    cached = get_cached_prices(pool_id, days=days)
+    if cached is not None:
+        return cached
+
+    df = await fetch_live_prices(pool_id, days=days)
+    if df is not None:
         return df["close"].values
 
     # Mock data: GBM around a base price
@@ -0,0 +1,32 @@
+import numpy as np
+
+from engine.backtest import calculate_clmm_il, calculate_clmm_il_batch
+
+
+def test_clmm_il_batch_matches_scalar():
+    rng = np.random.default_rng(0)
+    n = 500
+    p0 = rng.uniform(0.5, 1.5, n)
+    p1 = rng.uniform(0.2, 2.5, n)
+    pa = rng.uniform(0.3, 1.0, n)
+    pb = pa + rng.uniform(0.01, 1.0, n)
+
+    batch = calculate_clmm_il_batch(p0, p1, pa, pb)
+    expected = [calculate_clmm_il(*args) for args in zip(p0, p1, pa, pb)]
+    np.testing.assert_allclose(batch, expected, rtol=0, atol=1e-12)
+
+
+def test_clmm_il_batch_invalid_inputs_are_zero():
+    il = calculate_clmm_il_batch(
+        [1.0, 0.0, 1.0], [1.2, 1.0, -1.0], [1.1, 0.9, 0.9], [1.0, 1.1, 1.1]
+    )
+    np.testing.assert_array_equal(il, [0.0, 0.0, 0.0])
+
+
+def test_clmm_il_batch_broadcasts_paths_by_positions():
+    p1 = np.array([[0.8], [1.0], [1.3]])  # paths x 1
+    width = np.array([0.05, 0.15, 0.30])  # positions
+    il = calculate_clmm_il_batch(1.0, p1, 1 - width, 1 + width)
+    assert il.shape == (3, 3)
+    assert np.all(il <= 0)
+    np.testing.assert_array_equal(il[1], 0.0)
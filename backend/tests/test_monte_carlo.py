@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.monte_carlo import (
+    MIN_BOOTSTRAP_HOURS,
+    MIN_CORRELATION_HOURS,
+    default_path_model,
+    estimate_return_correlation,
+    generate_bootstrap_paths,
+    generate_gbm_paths,
+    run_monte_carlo,
+    run_portfolio_monte_carlo,
+)
+
+
+def _history(seed: int, n: int, base: float = 3.5) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return base * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+def _series(prices: np.ndarray, end: str = "2026-10-01 12:00") -> pd.Series:
+    return pd.Series(prices, index=pd.date_range(end=end, periods=len(prices), freq="h"))
+
+
+def _position(pool_id: str, price: float, **overrides) -> dict:
+    position = {
+        "pool_id": pool_id,
+        "current_price": price,
+        "fee_rate": 0.0025,
+        "amount_usd": 1000,
+        "pool_tvl": 3_000_000,
+        "daily_volume": 1_500_000,
+        "range_pct": 0.15,
+    }
+    position.update(overrides)
+    return position
+
+
+def test_correlation_rejects_short_overlap():
+    with pytest.raises(ValueError):
+        estimate_return_correlation(
+            [_series(_history(1, 720)), _series(_history(2, MIN_CORRELATION_HOURS))]
+        )
+
+
+def test_correlation_uses_full_history_for_vol_and_overlap_for_corr():
+    long, short = _history(1, 720), _history(2, 300)
+    volatility, drift, corr, n_obs = estimate_return_correlation([_series(long), _series(short)])
+
+    long_returns = np.diff(np.log(long))
+    assert n_obs == 299
+    assert volatility[0] == pytest.approx(long_returns.std() * np.sqrt(365 * 24))
+    assert drift[0] == pytest.approx(long_returns.mean() * 365 * 24)
+    np.testing.assert_allclose(np.diag(corr), 1.0)
+
+
+def test_correlation_aligns_on_timestamps_not_positions():
+    a = _history(1, 720)
+    # Same returns, different sampling minute; a stale copy ends 400h earlier
+    shifted = pd.Series(a, index=pd.date_range(end="2026-10-01 12:25", periods=720, freq="h"))
+    _, _, corr, n_obs = estimate_return_correlation([_series(a), shifted])
+    assert n_obs == 719
+    assert corr[0, 1] == pytest.approx(1.0)
+
+    stale = _series(_history(2, 720), end="2026-09-14 20:00")
+    _, _, _, n_obs = estimate_return_correlation([_series(a), stale])
+    assert n_obs == 719 - 400
+
+    with pytest.raises(ValueError):
+        estimate_return_correlation([_series(a), _series(a, end="2026-09-05 12:00")])
+
+
+def test_portfolio_single_position_matches_run_monte_carlo():
+    history = _history(1, 720)
+    price = float(history[-1])
+    returns = np.diff(np.log(history))
+
+    portfolio = run_portfolio_monte_carlo(
+        [_position("sui-usdc", price)], {"sui-usdc": _series(history)}, hold_days=10, n_simulations=300
+    )
+    single = run_monte_carlo(
+        current_price=price,
+        volatility=returns.std() * np.sqrt(365 * 24),
+        drift=returns.mean() * 365 * 24,
+        fee_rate=0.0025,
+        amount_usd=1000,
+        pool_tvl=3_000_000,
+        daily_volume=1_500_000,
+        hold_days=10,
+        range_pct=0.15,
+        n_simulations=300,
+    )
+    for key in ("mean_pnl", "median_pnl", "var_95", "var_99"):
+        assert portfolio[key] == pytest.approx(single[key], abs=0.011)
+    assert portfolio["correlation_hours"] == 719
+
+
+def test_portfolio_var_contributions_are_euler_allocation():
+    histories = {"a": _series(_history(1, 720)), "b": _series(_history(2, 720, base=0.045))}
+    positions = [
+        _position("a", float(histories["a"].iloc[-1])),
+        _position("b", float(histories["b"].iloc[-1]), range_pct=0.05, daily_volume=None),
+        _position("a", float(histories["a"].iloc[-1]), range_pct=0.30),
+    ]
+    result = run_portfolio_monte_carlo(positions, histories, hold_days=7, n_simulations=300)
+
+    # Contributions add up to the tail-scenario PnL, an estimate of var_95
+    total = sum(p["var_95_contribution"] for p in result["positions"])
+    assert total == pytest.approx(result["var_95"], rel=0.05)
+    assert sum(p["var_95_contribution_pct"] for p in result["positions"]) == pytest.approx(1.0, abs=1e-3)
+    assert result["pools"] == ["a", "b"]
+
+
+def test_gbm_paths_match_per_simulation_draws():
+    current_price, volatility, drift, hold_days, n_sims = 3.5, 0.8, 0.1, 5, 50
+    paths = generate_gbm_paths(current_price, volatility, drift, hold_days, n_sims)
+
+    # Original run_monte_carlo loop: one standard_normal(n_hours) per simulation
+    rng = np.random.default_rng(42)
+    dt = 1.0 / (365 * 24)
+    for path in paths:
+        z = rng.standard_normal(hold_days * 24)
+        log_returns = (drift - 0.5 * volatility**2) * dt + volatility * np.sqrt(dt) * z
+        expected = np.insert(current_price * np.exp(np.cumsum(log_returns)), 0, current_price)
+        np.testing.assert_allclose(path, expected, rtol=1e-12)
+
+
+def test_bootstrap_paths_resample_historical_returns():
+    history = _history(1, 720)
+    paths = generate_bootstrap_paths(3.5, history, hold_days=3, n_simulations=20)
+
+    assert paths.shape == (20, 3 * 24 + 1)
+    np.testing.assert_array_equal(paths[:, 0], 3.5)
+    returns = np.diff(np.log(history))
+    path_returns = np.diff(np.log(paths), axis=1)
+    nearest = np.abs(path_returns[..., None] - returns).min(axis=-1)
+    assert nearest.max() < 1e-12
+
+
+def test_bootstrap_rejects_short_history():
+    with pytest.raises(ValueError):
+        generate_bootstrap_paths(3.5, _history(1, MIN_BOOTSTRAP_HOURS), hold_days=3, n_simulations=20)
+    with pytest.raises(ValueError):
+        run_monte_carlo(
+            3.5, 0.8, 0.0, 0.0025, 1000, 3_000_000, None, 3, 0.15, 100,
+            model="bootstrap", price_history=_history(1, 30),
+        )
+
+
+def test_default_path_model_follows_history_length():
+    assert default_path_model(_history(1, MIN_BOOTSTRAP_HOURS + 1)) == "bootstrap"
+    assert default_path_model(_history(1, MIN_BOOTSTRAP_HOURS)) == "gbm"
+    assert default_path_model(None) == "gbm"
@@ -0,0 +1,34 @@
+import asyncio
+
+import pandas as pd
+
+from services import price_fetcher
+
+
+def _no_data(*args, **kwargs):
+    async def fetch():
+        return None
+    return fetch()
+
+
+def test_cached_series_keeps_timestamps(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_fetcher, "CACHE_DIR", tmp_path)
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2026-10-01", periods=72, freq="h"),
+        "close": range(72),
+    })
+    price_fetcher.save_cache("sui-usdc", df)
+
+    series = price_fetcher.get_cached_series("sui-usdc", days=2)
+    assert len(series) == 48
+    assert series.index[-1] == pd.Timestamp("2026-10-03 23:00")
+    assert series.iloc[-1] == 71
+
+
+def test_price_series_never_falls_back_to_mock(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_fetcher, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(price_fetcher, "fetch_birdeye_ohlcv", _no_data)
+    monkeypatch.setattr(price_fetcher, "fetch_coingecko_prices", _no_data)
+
+    assert asyncio.run(price_fetcher.get_price_series("sui-usdc")) is None
+    assert len(asyncio.run(price_fetcher.get_prices("sui-usdc", days=2))) == 48
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from engine.backtest import calculate_clmm_il
+from engine.monte_carlo import generate_gbm_paths
+from engine.rebalance import RebalancePolicy, _token_x_share, run_rebalancing_backtest
+
+FEE_RATE = 0.0025
+AMOUNT = 1000
+TVL = 3_000_000
+VOLUME = 8_000_000
+GAS = 0.05
+
+POLICIES = [
+    RebalancePolicy(0.05),
+    RebalancePolicy(0.10, threshold=0.03, cooldown_hours=6),
+    RebalancePolicy(0.30, cooldown_hours=24),
+    RebalancePolicy(1.0),
+]
+
+
+def _reference(prices: np.ndarray, policy: RebalancePolicy) -> tuple[float, int, int]:
+    """Per-hour scalar walk: (net_usd, rebalances, hours_in_range)."""
+    w = policy.range_pct
+    t = min(w, w if policy.threshold is None else policy.threshold)
+    cooldown = max(policy.cooldown_hours, 1)
+    fee_per_hour = VOLUME / 24 * FEE_RATE * AMOUNT / max(TVL, AMOUNT)
+
+    start, centre = 0, prices[0]
+    il = swap = 0.0
+    rebalances = hours_in_range = 0
+    for i, p in enumerate(prices):
+        rel = p / centre
+        if i >= start + cooldown and i < len(prices) - 1 and (rel < 1 - t or rel > 1 + t):
+            il += abs(calculate_clmm_il(1.0, rel, 1 - w, 1 + w)) * AMOUNT
+            swap += abs(_token_x_share(rel, 1 - w, 1 + w) - _token_x_share(1.0, 1 - w, 1 + w)) * AMOUNT * FEE_RATE
+            rebalances += 1
+            start, centre, rel = i, p, 1.0
+        if 1 - w <= rel <= 1 + w:
+            hours_in_range += 1
+    il += abs(calculate_clmm_il(1.0, prices[-1] / centre, 1 - w, 1 + w)) * AMOUNT
+    net = fee_per_hour * hours_in_range - il - swap - rebalances * GAS
+    return net, rebalances, hours_in_range
+
+
+@pytest.mark.parametrize("volatility", [0.4, 1.2])
+def test_matches_per_hour_reference(volatility):
+    paths = generate_gbm_paths(3.5, volatility, 0.0, 20, 8)
+    for prices in paths:
+        results = run_rebalancing_backtest(prices, FEE_RATE, AMOUNT, TVL, VOLUME, POLICIES, GAS)
+        for policy, result in zip(POLICIES, results):
+            net, rebalances, hours_in_range = _reference(prices, policy)
+            assert result["net_usd"] == pytest.approx(net, abs=0.006)
+            assert result["rebalances"] == rebalances
+            assert result["time_in_range"] == round(hours_in_range / len(prices), 3)
+
+
+def test_path_batch_is_mean_of_single_paths():
+    paths = generate_gbm_paths(3.5, 0.8, 0.0, 10, 5)
+    batch = run_rebalancing_backtest(paths, FEE_RATE, AMOUNT, TVL, VOLUME, POLICIES, GAS)
+    singles = [
+        run_rebalancing_backtest(p, FEE_RATE, AMOUNT, TVL, VOLUME, POLICIES, GAS) for p in paths
+    ]
+    for k, result in enumerate(batch):
+        assert result["net_usd"] == pytest.approx(
+            np.mean([s[k]["net_usd"] for s in singles]), abs=0.006
+        )
+        assert result["rebalances"] == pytest.approx(np.mean([s[k]["rebalances"] for s in singles]))
+
+
+def test_exit_on_last_hour_is_not_a_rebalance():
+    prices = np.array([1.0, 1.0, 1.0, 2.0])
+    [result] = run_rebalancing_backtest(prices, FEE_RATE, AMOUNT, TVL, VOLUME, [RebalancePolicy(0.05)])
+    assert result["rebalances"] == 0
+    assert result["time_in_range"] == 0.75
+
+
+def test_cooldown_delays_rebalance():
+    prices = np.array([1.0, 1.2, 1.2, 1.2, 1.2, 1.2])
+    no_cooldown, cooldown = run_rebalancing_backtest(
+        prices, FEE_RATE, AMOUNT, TVL, VOLUME,
+        [RebalancePolicy(0.05), RebalancePolicy(0.05, cooldown_hours=3)],
+    )
+    # Both rebalance once; the cooldown keeps three hours out of range first
+    assert no_cooldown["rebalances"] == cooldown["rebalances"] == 1
+    assert no_cooldown["time_in_range"] == 1.0
+    assert cooldown["time_in_range"] == round(4 / 6, 3)
@@ -41,6 +41,7 @@ export interface MonteCarloResult {
   var_99: number;
   profit_probability: number;
   n_simulations: number;
+  model: "gbm" | "bootstrap";
   histogram: { bin_start: number; bin_end: number; count: number }[];
   range: [number, number];
 }